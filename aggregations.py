@@ -0,0 +1,104 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import settings
+from cube import summary_rollups
+from dataset import filter_rows
+from schema import observed_counts
+from timeseries import downsample
+
+# Identifies one filter selection over one version of the loaded data
+FilterKey = namedtuple('FilterKey', ['version', 'facilities', 'departments', 'start', 'end'])
+
+# Task-progress bands of the project panel, lowest first, and their bin edges
+PROGRESS_BANDS = ["منخفض (أقل من 50%)", "متوسط (50-74%)", "عالي (75-100%)"]
+PROGRESS_BAND_EDGES = [0, 50, 75, 101]
+
+
+def make_filter_key(version, facilities, departments, start, end):
+    """Build a hashable, order-insensitive key for the sidebar selection"""
+    return FilterKey(version, tuple(sorted(facilities)), tuple(sorted(departments)), start, end)
+
+
+@st.cache_data(max_entries=settings.AGGREGATION_CACHE_ENTRIES, show_spinner=False)
+def summarize(_cubes, key):
+    """Compute every KPI and chart summary for the selection identified by `key`
+
+    Summaries are read from the pre-aggregated cubes rather than the raw
+    rows. The cubes are not hashed (leading underscore); `key` alone
+    decides whether a cached summary is reused, so widget clicks that leave
+    the sidebar selection unchanged never recompute anything.
+    """
+    start, end = _date_bounds(key)
+    rollups = summary_rollups(_cubes['employees'], _cubes['daily_reports'], key.facilities, key.departments, start, end)
+    return _summary_from_rollups(rollups, start, end)
+
+
+@st.cache_data(max_entries=settings.AGGREGATION_CACHE_ENTRIES, show_spinner=False)
+def sharded_summarize(_shards, key):
+    """`summarize` over a ShardPool: each shard rolls up its own facilities and the roll-ups are merged"""
+    start, end = _date_bounds(key)
+    return _summary_from_rollups(_shards.rollups(key.facilities, key.departments, start, end), start, end)
+
+
+def _date_bounds(key):
+    start = pd.Timestamp(key.start) if key.start is not None else None
+    end = pd.Timestamp(key.end) if key.end is not None else None
+    return start, end
+
+
+def _summary_from_rollups(rollups, start, end):
+    """Every KPI and chart summary from the roll-ups of `summary_rollups`"""
+    employees = {dim: rollups[('employees', dim)] for dim in ('المنشأة', 'القسم', 'المشروع الحالي', 'حالة المشروع')}
+    by_department = rollups[('daily_reports', 'القسم')]
+    by_day = rollups[('daily_reports', 'التاريخ')]
+    completion_trend, completion_bucket = downsample(
+        by_day.labels['التاريخ'], by_day.sums['نسبة الإنجاز'], by_day.counts, start, end,
+        settings.TIMESERIES_MAX_POINTS
+    )
+
+    return {
+        'employee_count': int(employees['المنشأة'].total()),
+        'daily_reports_count': int(by_day.total()),
+        'avg_completion': by_day.mean('نسبة الإنجاز'),
+        'facility_counts': employees['المنشأة'].count_series('المنشأة'),
+        'status_counts': employees['حالة المشروع'].count_series('حالة المشروع'),
+        'department_counts': employees['القسم'].count_series('القسم'),
+        'project_counts': employees['المشروع الحالي'].count_series('المشروع الحالي'),
+        'project_progress': (
+            employees['المشروع الحالي'].mean_series('المشروع الحالي', 'تقدم المهمة').sort_values(ascending=False)
+        ),
+        'completion_trend': completion_trend,
+        'completion_bucket': completion_bucket,
+        'department_performance': (
+            by_department.mean_series('القسم', 'نسبة الإنجاز').sort_values(ascending=False)
+        )
+    }
+
+
+@st.cache_data(max_entries=settings.AGGREGATION_CACHE_ENTRIES, show_spinner=False)
+def project_summary(_dataset, project, key):
+    """Compute the team and statistics of `project` for the selection identified by `key`
+
+    Returns the team's row positions rather than the team rows, and counts
+    the progress bands with one histogram pass over the team's progress.
+    """
+    employees = _dataset.employees
+    rows = filter_rows(employees, _dataset.employee_rows(key.facilities, key.departments), 'المشروع الحالي', [project])
+    progress = employees['تقدم المهمة'].to_numpy()[rows]
+    band_counts, _ = np.histogram(progress, bins=PROGRESS_BAND_EDGES)
+    department_counts = observed_counts(employees['القسم'].iloc[rows])
+
+    return {
+        'team_rows': rows,
+        'team_size': len(rows),
+        'avg_progress': progress.mean() if len(rows) else 0,
+        'facility_count': employees['المنشأة'].iloc[rows].nunique(),
+        'department_count': len(department_counts),
+        'department_counts': department_counts,
+        # Highest band first
+        'progress_bands': pd.Series(band_counts, index=PROGRESS_BANDS).iloc[::-1]
+    }
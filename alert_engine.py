@@ -0,0 +1,179 @@
+import heapq
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from cube import Cube
+
+EQUIPMENT = "equipment"
+DELAYS = "delays"
+STAFFING = "staffing"
+
+# Report values that raise each alert
+EQUIPMENT_CHALLENGE = "نقص في المعدات"
+STAFFING_CHALLENGE = "نقص الكادر"
+DELAYED_STATUS = "متأخرة"
+
+# Dimensions alert reports are counted over
+ALERT_DIMS = ('المنشأة', 'القسم', 'التاريخ')
+
+
+def _alert_cube(reports):
+    """Report counts over facility × department × day of categorical facility and department columns"""
+    days = pd.DatetimeIndex(reports['التاريخ']).normalize()
+    labels = pd.DatetimeIndex(np.unique(days.to_numpy()))
+    return Cube.from_codes(
+        ALERT_DIMS,
+        {'المنشأة': reports['المنشأة'].cat.categories, 'القسم': reports['القسم'].cat.categories, 'التاريخ': labels},
+        {'المنشأة': reports['المنشأة'].cat.codes.to_numpy(), 'القسم': reports['القسم'].cat.codes.to_numpy(),
+         'التاريخ': labels.get_indexer(days)},
+        {}
+    )
+
+
+def _day(value):
+    return None if value is None else pd.Timestamp(value)
+
+
+class AlertEngine:
+    """Alert counts and recent alert items, maintained incrementally as reports arrive
+
+    Each batch of daily or weekly reports is scanned once on arrival and
+    folded into a small cube of alert-report counts per facility,
+    department and day, plus a bounded list of the newest items per
+    facility and department. Reading a count or the item list for a
+    sidebar selection (facilities, departments, date range) then only
+    touches those small structures, never the report history.
+    """
+
+    def __init__(self, recent_limit=20):
+        self.recent_limit = recent_limit
+        self._counts = {EQUIPMENT: None, DELAYS: None, STAFFING: None}
+        self._recent = {EQUIPMENT: {}, DELAYS: {}}
+
+    def copy(self):
+        """Return an independent copy, so a batch can be folded into it without changing this engine"""
+        engine = AlertEngine(self.recent_limit)
+        # Cubes and item lists are replaced rather than changed in place, so copying the mappings is enough
+        engine._counts = dict(self._counts)
+        engine._recent = {kind: dict(recent) for kind, recent in self._recent.items()}
+        return engine
+
+    def _add_counts(self, kind, reports):
+        cube = _alert_cube(reports)
+        self._counts[kind] = cube if self._counts[kind] is None else self._counts[kind].merge(cube)
+
+    def _keep_recent(self, kind, items):
+        """Merge new items into each facility and department's bounded newest-first list"""
+        by_key = {}
+        for item in items:
+            by_key.setdefault((item['المنشأة'], item['القسم']), []).append(item)
+        recent = self._recent[kind]
+        for key, new_items in by_key.items():
+            recent[key] = heapq.nlargest(
+                self.recent_limit, recent.get(key, []) + new_items, key=lambda item: item['التاريخ']
+            )
+
+    def _newest_items(self, frame, fields):
+        """The newest `recent_limit` rows of each facility and department as item dicts"""
+        newest = (frame.sort_values('التاريخ', kind='stable')
+                  .groupby(['المنشأة', 'القسم'], observed=True).tail(self.recent_limit))
+        return newest[list(fields)].rename(columns=fields).to_dict('records')
+
+    def add_daily(self, reports):
+        """Fold a batch of daily reports into the alert state"""
+        equipment = reports[reports['التحديات'] == EQUIPMENT_CHALLENGE]
+        self._add_counts(EQUIPMENT, equipment)
+        self._keep_recent(EQUIPMENT, self._newest_items(equipment, {
+            'التاريخ': 'التاريخ', 'المنشأة': 'المنشأة', 'القسم': 'القسم', 'التحديات': 'التحدي',
+            'الاسم': 'الموظف', 'معرف الموظف': 'رقم الهاتف', 'المهمة الحالية': 'المهمة'
+        }))
+
+        delayed = reports[reports['حالة مهام الأمس'] == DELAYED_STATUS]
+        self._add_counts(DELAYS, delayed)
+        self._keep_recent(DELAYS, self._newest_items(delayed, {
+            'التاريخ': 'التاريخ', 'المنشأة': 'المنشأة', 'القسم': 'القسم', 'المهمة الحالية': 'المهمة',
+            'الاسم': 'الموظف', 'معرف الموظف': 'رقم الهاتف'
+        }))
+
+        self._add_counts(STAFFING, reports[reports['التحديات'] == STAFFING_CHALLENGE])
+
+    def add_weekly(self, reports):
+        """Fold a batch of weekly reports into the alert state
+
+        A weekly report with overdue tasks counts as one delay report, like
+        a daily report marked delayed, however many tasks it lists. It is
+        dated by its week and counted against the reporter's department,
+        which the reports must carry in `القسم` (see Dataset); reporters
+        with no known department are left out.
+        """
+        delayed = reports[reports['المهام المتأخرة'] > 0]
+        delayed = delayed.assign(**{'التاريخ': pd.to_datetime(delayed['الأسبوع'])})
+        self._add_counts(DELAYS, delayed)
+        items = self._newest_items(delayed, {
+            'التاريخ': 'التاريخ', 'المنشأة': 'المنشأة', 'القسم': 'القسم', 'المهام المتأخرة': 'المهام المتأخرة',
+            'الاسم': 'الموظف', 'معرف الموظف': 'رقم الهاتف'
+        })
+        for item in items:
+            item['المهمة'] = f"{item.pop('المهام المتأخرة')} مهام متأخرة (تقرير أسبوعي)"
+        self._keep_recent(DELAYS, items)
+
+    def _selected(self, kind, facilities, departments, start, end):
+        """The kind's count cube cut to the selection, or None before any report was added"""
+        cube = self._counts[kind]
+        if cube is None:
+            return None
+        selected = cube.slice({'المنشأة': facilities, 'القسم': departments})
+        return selected.slice_range('التاريخ', _day(start), _day(end))
+
+    def count(self, kind, facilities=None, departments=None, start=None, end=None):
+        """Number of alert reports (equipment, delays) or departments (staffing) in the selection
+
+        Empty or None facilities and departments select all of them; the
+        date range is inclusive, and open-ended when a bound is None.
+        """
+        cube = self._selected(kind, facilities, departments, start, end)
+        if cube is None:
+            return 0
+        if kind == STAFFING:
+            return int((cube.rollup('المنشأة', 'القسم').counts > 0).sum())
+        return int(cube.total())
+
+    def items(self, kind, facilities=None, departments=None, start=None, end=None, limit=None):
+        """Newest alert items in the selection, newest first
+
+        Staffing items are the departments with shortage reports in the
+        range, most reports first, with the date of their latest report.
+        Equipment and delay items come from the newest `recent_limit` kept
+        per facility and department.
+        """
+        if kind == STAFFING:
+            return self._staffing_needs(facilities, departments, start, end)[:limit]
+        facilities, departments = set(facilities or ()), set(departments or ())
+        # Reports carry a time of day, so the range runs up to the start of the day after `end`
+        start, stop = _day(start), None if end is None else _day(end) + pd.Timedelta(days=1)
+        selected = [
+            (item for item in items
+             if (start is None or item['التاريخ'] >= start) and (stop is None or item['التاريخ'] < stop))
+            for (facility, department), items in self._recent[kind].items()
+            if (not facilities or facility in facilities) and (not departments or department in departments)
+        ]
+        newest = heapq.merge(*selected, key=lambda item: item['التاريخ'], reverse=True)
+        return list(islice(newest, limit))
+
+    def _staffing_needs(self, facilities, departments, start, end):
+        cube = self._selected(STAFFING, facilities, departments, start, end)
+        if cube is None:
+            return []
+        counts = cube.rollup('المنشأة', 'القسم').counts
+        # Last day with a report, read backwards along the day axis
+        last_day = cube.counts.shape[2] - 1 - np.argmax(cube.counts[:, :, ::-1] > 0, axis=2)
+        cells = np.argwhere(counts > 0)
+        order = np.argsort(-counts[counts > 0], kind='stable')
+        days = cube.labels['التاريخ']
+        return [
+            {'المنشأة': cube.labels['المنشأة'][f], 'القسم': cube.labels['القسم'][d],
+             'عدد التقارير': int(counts[f, d]), 'التاريخ': days[last_day[f, d]]}
+            for f, d in cells[order]
+        ]
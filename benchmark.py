@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+DASHBOARD = Path(__file__).with_name('demo_manager_dashboard.py')
+DEFAULT_BASELINE = Path(__file__).with_name('benchmark_baseline.json')
+
+# Demo data sizes → (employees, daily reports, weekly reports)
+SCALES = {
+    'small': (200, 150, 80),
+    'medium': (10_000, 100_000, 5_000),
+    'large': (100_000, 5_000_000, 50_000)
+}
+SEED = 7
+# Longest a single rerun may take before the run is abandoned
+RUN_TIMEOUT = 1800
+# Slowdowns smaller than this many seconds (or MB of RSS) are never reported as regressions
+MIN_REGRESSION = {'s': 0.05, 'mb': 10}
+
+
+def _button(at, prefix):
+    """First button whose key starts with `prefix`"""
+    for button in at.button:
+        if button.key and button.key.startswith(prefix):
+            return button
+    raise LookupError(f"no button with key {prefix}*")
+
+
+def _filter_facilities(at):
+    facilities = at.sidebar.multiselect[0]
+    facilities.set_value(facilities.options[:3]).run()
+
+
+def _filter_dates(at):
+    today = date.today()
+    at.sidebar.date_input[0].set_value((today - timedelta(days=7), today)).run()
+
+
+# Media file manager of the latest AppTest run, which holds the download buttons' deferred exports
+_media = {}
+
+
+def _download_exports(at):
+    """Generate every export of the current run through Streamlit, as clicking its download button would"""
+    buttons = at.get('download_button')
+    if not buttons:
+        raise LookupError("no download buttons")
+    for button in buttons:
+        _media['manager'].execute_deferred(button.proto.deferred_file_id)
+
+
+# Scripted interactions, replayed in order after the cold start
+INTERACTIONS = [
+    ('open_project', lambda at: _button(at, 'project_btn_').click().run()),
+    ('close_project', lambda at: _button(at, 'close_project_main').click().run()),
+    ('open_equipment_alert', lambda at: _button(at, 'equipment_alert').click().run()),
+    ('open_delay_alert', lambda at: _button(at, 'delay_alert').click().run()),
+    ('open_staffing_alert', lambda at: _button(at, 'staffing_alert').click().run()),
+    ('search_directory', lambda at: at.text_input[0].input("محمد").run()),
+    ('download_exports', _download_exports),
+    ('filter_facilities', _filter_facilities),
+    ('filter_dates', _filter_dates),
+]
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def run_scale():
+    """Run the dashboard once at the scale set in the environment and return its timings
+
+    The cold run is profiled (wall time only) so the time to the header and
+    to the KPI cards can be read from its section timings; profiling is then
+    switched off for the interactions.
+    """
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.testing.v1 import AppTest
+
+    import settings
+    from profiling import SESSION_KEY
+
+    # AppTest never clicks download buttons, so keep each run's media file manager to run their exports
+    class RecordingMediaFileManager(MediaFileManager):
+        def __init__(self, storage):
+            super().__init__(storage)
+            _media['manager'] = self
+
+    mock.patch('streamlit.testing.v1.app_test.MediaFileManager', RecordingMediaFileManager).start()
+    at = AppTest.from_file(str(DASHBOARD), default_timeout=RUN_TIMEOUT)
+    started = time.perf_counter()
+    at.run()
+    result = {'cold_start_s': time.perf_counter() - started, 'interactions_s': {}}
+    profiler = at.session_state[SESSION_KEY]
+    for metric, name in (('first_paint_s', 'header'), ('first_screen_s', 'kpis')):
+        result[metric] = profiler.started + profiler.sections[name]['at_ms'] / 1000 - started
+    settings.PROFILE = False
+    for name, interact in INTERACTIONS:
+        started = time.perf_counter()
+        interact(at)
+        result['interactions_s'][name] = time.perf_counter() - started
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].value}")
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+
+def benchmark(scale, repeat=1):
+    """Median timings and peak RSS over `repeat` fresh processes at `scale`"""
+    employees, daily_reports, weekly_reports = SCALES[scale]
+    env = dict(os.environ, DASHBOARD_DEMO_EMPLOYEES=str(employees), DASHBOARD_DEMO_DAILY_REPORTS=str(daily_reports),
+               DASHBOARD_DEMO_WEEKLY_REPORTS=str(weekly_reports), DASHBOARD_DEMO_SEED=str(SEED))
+    # Each run gets its own interpreter so caches start cold and peak RSS belongs to one scale
+    for name in ('DASHBOARD_DATA_DIR', 'DASHBOARD_DATABASE', 'DASHBOARD_INBOX_DIR', 'DASHBOARD_PROFILE_LOG'):
+        env.pop(name, None)
+    env.update(DASHBOARD_PROFILE='1', DASHBOARD_PROFILE_MEMORY='0')
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, __file__, '--run-scale'], env=env, check=True,
+                                capture_output=True, text=True).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    return {
+        'employees': employees,
+        'daily_reports': daily_reports,
+        'cold_start_s': statistics.median(run['cold_start_s'] for run in runs),
+        'first_paint_s': statistics.median(run['first_paint_s'] for run in runs),
+        'first_screen_s': statistics.median(run['first_screen_s'] for run in runs),
+        'interactions_s': {name: statistics.median(run['interactions_s'][name] for run in runs)
+                           for name, _ in INTERACTIONS},
+        'peak_rss_mb': max(run['peak_rss_mb'] for run in runs)
+    }
+
+
+def _metrics(result):
+    """Flatten one scale's result into (metric, value, unit) triples"""
+    yield 'cold_start', result['cold_start_s'], 's'
+    # Older baselines may predate these two
+    for metric in ('first_paint', 'first_screen'):
+        if f'{metric}_s' in result:
+            yield metric, result[f'{metric}_s'], 's'
+    for name, seconds in result['interactions_s'].items():
+        yield name, seconds, 's'
+    yield 'peak_rss', result['peak_rss_mb'], 'mb'
+
+
+def compare(results, baseline, tolerance):
+    """Rows of (scale, metric, current, baseline, change, regressed) for scales present in both"""
+    rows = []
+    for scale, result in results.items():
+        if scale not in baseline:
+            continue
+        previous = dict((metric, value) for metric, value, _ in _metrics(baseline[scale]))
+        for metric, value, unit in _metrics(result):
+            if metric not in previous:
+                continue
+            change = value / previous[metric] - 1 if previous[metric] else 0.0
+            regressed = change > tolerance and value - previous[metric] > MIN_REGRESSION[unit]
+            rows.append((scale, metric, value, previous[metric], change, regressed))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard headlessly at increasing data scales")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=['small', 'medium'])
+    parser.add_argument("--repeat", type=int, default=1, help="fresh runs per scale; timings are medians")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown over the baseline (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--output", type=Path, help="also write the results to this JSON file")
+    parser.add_argument("--run-scale", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scale:
+        print(json.dumps(run_scale()))
+        sys.exit(0)
+
+    results = {}
+    for scale in args.scales:
+        results[scale] = benchmark(scale, args.repeat)
+        print(f"{scale}: {results[scale]['employees']} employees, {results[scale]['daily_reports']} daily reports")
+        for metric, value, unit in _metrics(results[scale]):
+            print(f"  {metric:<22} {value:10.3f} {unit}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    regressions = 0
+    if args.baseline.exists() and not args.save_baseline:
+        print(f"\nCompared with {args.baseline}:")
+        for scale, metric, value, previous, change, regressed in compare(
+                results, json.loads(args.baseline.read_text()), args.tolerance):
+            regressions += regressed
+            print(f"  {scale:<7} {metric:<22} {previous:10.3f} → {value:10.3f} {change:+7.1%}"
+                  f"{'  REGRESSION' if regressed else ''}")
+
+    if args.save_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2))
+        print(f"\nBaseline saved to {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,71 @@
+import hashlib
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+import settings
+
+
+def content_hash(data):
+    """Hash of a series' or frame's values, index and labels, stable across reruns and sessions"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    labels = list(data.columns) if isinstance(data, pd.DataFrame) else data.name
+    digest.update(str(labels).encode())
+    return digest.hexdigest()
+
+
+def _pie(series, title, colors=None, font_size=None):
+    figure = go.Figure(
+        go.Pie(labels=series.index, values=series.values, marker=dict(colors=colors) if colors else None),
+        layout=dict(title=dict(text=title), legend=dict(tracegroupgap=0))
+    )
+    if font_size:
+        figure.update_layout(font=dict(size=font_size))
+    return figure
+
+
+def _bar(series, title, x_title=None, y_title=None, color_scale=None, height=None):
+    marker = dict(color=series.values, colorscale=color_scale, showscale=True) if color_scale else None
+    return go.Figure(
+        go.Bar(x=series.values, y=series.index, orientation='h', marker=marker),
+        layout=dict(title=dict(text=title), xaxis_title=x_title, yaxis_title=y_title, height=height)
+    )
+
+
+def _band(frame, title, x_title=None, y_title=None):
+    """Mean line over a shaded min-max band, with the report count in the hover"""
+    x = frame.index
+    return go.Figure(
+        [
+            go.Scatter(x=x, y=frame['max'], mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'),
+            go.Scatter(x=x, y=frame['min'], mode='lines', line=dict(width=0), fill='tonexty',
+                       fillcolor='rgba(99, 110, 250, 0.2)', showlegend=False, hoverinfo='skip'),
+            go.Scatter(x=x, y=frame['mean'], mode='lines+markers', showlegend=False, customdata=frame['count'],
+                       hovertemplate='%{x}<br>%{y:.1f}%<br>n=%{customdata}<extra></extra>')
+        ],
+        layout=dict(title=dict(text=title), xaxis_title=x_title, yaxis_title=y_title)
+    )
+
+
+_BUILDERS = {'pie': _pie, 'bar': _bar, 'band': _band}
+
+
+@st.cache_resource(max_entries=settings.FIGURE_CACHE_ENTRIES, show_spinner=False)
+def _cached_figure(kind, digest, options, _series):
+    return _BUILDERS[kind](_series, **dict(options))
+
+
+def figure(kind, series, **options):
+    """Return a 'pie' or horizontal 'bar' figure of a summary series, or a 'band' figure of a time-series frame
+
+    Figures are built with graph_objects rather than plotly express, which
+    Streamlit does not import itself and which is slow to load; they are
+    shared across reruns and sessions, keyed on the content hash of the
+    series, so an unchanged chart is not rebuilt. Shared figures must not
+    be modified.
+    """
+    options = tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                           for name, value in options.items()))
+    return _cached_figure(kind, content_hash(series), options, series)
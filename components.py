@@ -0,0 +1,55 @@
+import numpy as np
+import streamlit as st
+
+import settings
+from export import FORMATS, export_file
+
+
+def group_by_facility(team):
+    """Order team members facility by facility in one groupby pass
+
+    Returns the reordered frame and the member count of each facility.
+    """
+    groups = team.groupby('المنشأة', observed=True, sort=False)
+    positions = list(groups.indices.values())
+    ordered = team.iloc[np.concatenate(positions)] if positions else team
+    return ordered, groups.size()
+
+
+def paginate(frame, key, page_size=None):
+    """Render a page picker for `frame` and return only the rows of the selected page
+
+    Keeps the number of elements a panel emits per rerun bounded by the
+    page size, however many rows the frame has.
+    """
+    page_size = page_size or settings.TEAM_PAGE_SIZE
+    pages = max(1, -(-len(frame) // page_size))
+    page = 1
+    if pages > 1:
+        page = st.number_input(
+            f"الصفحة / Page (1-{pages})", min_value=1, max_value=pages, value=1, step=1, key=key
+        )
+    first = (page - 1) * page_size
+    stop = min(first + page_size, len(frame))
+    if pages > 1:
+        st.caption(f"عرض {first + 1}-{stop} من أصل {len(frame)} / Showing {first + 1}-{stop} of {len(frame)}")
+    return frame.iloc[first:stop]
+
+
+def export_buttons(frame, rows, columns, name, key):
+    """Render CSV and Parquet download buttons for the selected rows of `frame`
+
+    The file is only written when a button is clicked, streamed chunk by
+    chunk from the row positions.
+    """
+    for column, fmt in zip(st.columns(len(FORMATS)), FORMATS):
+        extension, mime, _ = FORMATS[fmt]
+        with column:
+            st.download_button(
+                f"⬇️ {fmt.upper()}",
+                data=lambda fmt=fmt: export_file(frame, rows, columns, fmt),
+                file_name=f"{name}.{extension}",
+                mime=mime,
+                key=f"{key}_{fmt}",
+                on_click="ignore"
+            )
@@ -0,0 +1,170 @@
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+# Dimensions of the two cubes the dashboard charts read from
+EMPLOYEE_DIMS = ('المنشأة', 'القسم', 'المشروع الحالي', 'حالة المشروع')
+REPORT_DIMS = ('المنشأة', 'القسم', 'التاريخ')
+
+
+class Cube:
+    """Dense array of row counts and measure sums over categorical dimensions
+
+    Each axis is one dimension, labelled by `labels[dim]`. Slicing keeps a
+    subset of labels along some axes and roll-up sums away the others, so a
+    chart summary is a few array reductions over the cells instead of a
+    scan of the raw rows. Means are derived from sum / count.
+    """
+
+    def __init__(self, dims, labels, counts, sums):
+        self.dims = tuple(dims)
+        self.labels = dict(labels)
+        self.counts = counts
+        self.sums = dict(sums)
+
+    @classmethod
+    def from_codes(cls, dims, labels, codes, measures):
+        """Build a cube from per-row integer codes (-1 = missing) and measure columns"""
+        shape = tuple(len(labels[dim]) for dim in dims)
+        valid = np.logical_and.reduce([codes[dim] >= 0 for dim in dims])
+        cells = np.ravel_multi_index([codes[dim][valid] for dim in dims], shape)
+        size = int(np.prod(shape))
+        counts = np.bincount(cells, minlength=size).reshape(shape)
+        sums = {
+            measure: np.bincount(cells, weights=np.asarray(values, dtype='float64')[valid], minlength=size).reshape(shape)
+            for measure, values in measures.items()
+        }
+        return cls(dims, labels, counts, sums)
+
+    def merge(self, other):
+        """Return a cube holding the cells of both cubes added together
+
+        Labels are unioned per dimension, so cubes built from separate
+        batches (with new days or new categories) combine exactly.
+        """
+        labels = {}
+        for dim in self.dims:
+            mine, theirs = self.labels[dim], other.labels[dim]
+            union = mine.append(theirs[~theirs.isin(mine)])
+            labels[dim] = union.sort_values() if isinstance(union, pd.DatetimeIndex) else union
+        shape = tuple(len(labels[dim]) for dim in self.dims)
+
+        def expand(cube, array):
+            out = np.zeros(shape, dtype=array.dtype)
+            out[np.ix_(*(labels[dim].get_indexer(cube.labels[dim]) for dim in self.dims))] = array
+            return out
+
+        counts = expand(self, self.counts) + expand(other, other.counts)
+        sums = {measure: expand(self, array) + expand(other, other.sums[measure]) for measure, array in self.sums.items()}
+        return Cube(self.dims, labels, counts, sums)
+
+    def _axis(self, dim):
+        return self.dims.index(dim)
+
+    def slice(self, selections):
+        """Keep only the given labels along each dimension in `selections`
+
+        An empty or None selection keeps the whole dimension.
+        """
+        counts, sums, labels = self.counts, self.sums, dict(self.labels)
+        for dim, values in selections.items():
+            if values is None or len(values) == 0:
+                continue
+            positions = labels[dim].get_indexer(list(values))
+            positions = positions[positions >= 0]
+            axis = self._axis(dim)
+            counts = counts.take(positions, axis=axis)
+            sums = {measure: array.take(positions, axis=axis) for measure, array in sums.items()}
+            labels[dim] = labels[dim][positions]
+        return Cube(self.dims, labels, counts, sums)
+
+    def slice_range(self, dim, start=None, end=None):
+        """Keep the contiguous run of sorted labels between start and end inclusive"""
+        index = self.labels[dim]
+        first = 0 if start is None else index.searchsorted(start, side='left')
+        stop = len(index) if end is None else index.searchsorted(end, side='right')
+        return self.slice({dim: index[first:stop]}) if (first, stop) != (0, len(index)) else self
+
+    def rollup(self, *keep):
+        """Sum away every dimension not in `keep`"""
+        axes = tuple(axis for axis, dim in enumerate(self.dims) if dim not in keep)
+        dims = [dim for dim in self.dims if dim in keep]
+        return Cube(
+            dims,
+            {dim: self.labels[dim] for dim in dims},
+            self.counts.sum(axis=axes),
+            {measure: array.sum(axis=axes) for measure, array in self.sums.items()}
+        )
+
+    def total(self, measure=None):
+        """Total row count, or total of `measure`"""
+        return (self.counts if measure is None else self.sums[measure]).sum()
+
+    def mean(self, measure):
+        """Overall mean of `measure`, or 0 for an empty cube"""
+        count = self.counts.sum()
+        return self.sums[measure].sum() / count if count else 0
+
+    def count_series(self, dim):
+        """Row counts per label of `dim`, largest first, without empty cells"""
+        counts = pd.Series(self.rollup(dim).counts, index=self.labels[dim].rename(dim), name='count')
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    def mean_series(self, dim, measure):
+        """Mean of `measure` per label of `dim`, in label order, without empty cells"""
+        rolled = self.rollup(dim)
+        observed = rolled.counts > 0
+        return pd.Series(
+            rolled.sums[measure][observed] / rolled.counts[observed],
+            index=self.labels[dim][observed].rename(dim),
+            name=measure
+        )
+
+
+def _category_codes(frame, dim):
+    return frame[dim].cat.codes.to_numpy()
+
+
+def build_employee_cube(employees):
+    """Employee counts and task-progress sums over facility × department × project × status"""
+    return Cube.from_codes(
+        EMPLOYEE_DIMS,
+        {dim: employees[dim].cat.categories for dim in EMPLOYEE_DIMS},
+        {dim: _category_codes(employees, dim) for dim in EMPLOYEE_DIMS},
+        {'تقدم المهمة': employees['تقدم المهمة'].to_numpy()}
+    )
+
+
+def build_report_cube(store):
+    """Report counts and completion sums over facility × department × day
+
+    The day axis comes straight from the store's day partitions.
+    """
+    frame = store.frame
+    day_codes = np.repeat(np.arange(len(store.days)), np.diff(store.day_starts))
+    labels = {dim: frame[dim].cat.categories for dim in REPORT_DIMS[:-1]}
+    labels['التاريخ'] = pd.DatetimeIndex(store.days.astype('datetime64[ns]'))
+    codes = {dim: _category_codes(frame, dim) for dim in REPORT_DIMS[:-1]}
+    codes['التاريخ'] = day_codes
+    return Cube.from_codes(REPORT_DIMS, labels, codes, {'نسبة الإنجاز': frame['نسبة الإنجاز'].to_numpy()})
+
+
+def summary_rollups(employee_cube, report_cube, facilities=None, departments=None, start=None, end=None):
+    """One-dimensional roll-ups of the selected slice that every sidebar summary is read from
+
+    Keys are (cube, dimension) pairs. Roll-ups hold only counts and sums,
+    so those of disjoint shards combine exactly with `merge_rollups` and
+    means are taken after merging rather than averaged.
+    """
+    selection = {'المنشأة': facilities, 'القسم': departments}
+    employees = employee_cube.slice(selection)
+    reports = report_cube.slice(selection).slice_range('التاريخ', start, end)
+    rollups = {('employees', dim): employees.rollup(dim) for dim in EMPLOYEE_DIMS}
+    rollups.update({('daily_reports', dim): reports.rollup(dim) for dim in ('القسم', 'التاريخ')})
+    return rollups
+
+
+def merge_rollups(parts):
+    """Add together the roll-ups of several shards, label by label"""
+    return {name: reduce(Cube.merge, [part[name] for part in parts]) for name in parts[0]}
@@ -0,0 +1,62 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+DATE_COLUMN = 'التاريخ'
+
+
+class DailyReportStore:
+    """Daily reports kept sorted by date and partitioned by day
+
+    Rows are ordered by the datetime64 `التاريخ` column, and `day_starts`
+    holds the first row of each day, so a date range resolves to a
+    contiguous row slice with two binary searches instead of a full scan.
+    """
+
+    def __init__(self, frame):
+        self.frame = self._sorted(frame).reset_index(drop=True)
+        self._index_days()
+
+    @staticmethod
+    def _sorted(frame):
+        frame = frame.assign(**{DATE_COLUMN: pd.to_datetime(frame[DATE_COLUMN]).astype('datetime64[ns]')})
+        return frame.sort_values(DATE_COLUMN, kind='stable')
+
+    def _index_days(self):
+        dates = self.frame[DATE_COLUMN].to_numpy().astype('datetime64[D]')
+        self.days, starts = np.unique(dates, return_index=True)
+        self.day_starts = np.append(starts, len(self.frame))
+
+    def appended(self, reports):
+        """Return a new store holding these reports plus a batch, sorted and partitioned by day
+
+        A batch that starts on or after the last stored day (the usual case
+        for new reports) is concatenated as is; an older batch is merged in
+        with a stable sort. This store is left unchanged, so row positions
+        already taken from it stay valid.
+        """
+        batch = self._sorted(reports)
+        if batch.empty:
+            return self
+        in_order = not len(self.frame) or batch[DATE_COLUMN].iloc[0] >= self.frame[DATE_COLUMN].iloc[-1]
+        frame = pd.concat([self.frame, batch], ignore_index=True)
+        store = copy.copy(self)
+        store.frame = frame if in_order else frame.sort_values(DATE_COLUMN, kind='stable').reset_index(drop=True)
+        store._index_days()
+        return store
+
+    def astype(self, dtypes):
+        """Return a store over the same rows and day partitions with columns cast to `dtypes`"""
+        store = copy.copy(self)
+        store.frame = self.frame.astype(dtypes)
+        return store
+
+    def __len__(self):
+        return len(self.frame)
+
+    def bounds(self, start=None, end=None):
+        """Return the (first, stop) row positions covering days start..end inclusive"""
+        first = 0 if start is None else np.searchsorted(self.days, np.datetime64(start, 'D'), side='left')
+        last = len(self.days) if end is None else np.searchsorted(self.days, np.datetime64(end, 'D'), side='right')
+        return int(self.day_starts[first]), int(self.day_starts[last])
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from schema import CATEGORY_DTYPES, EMPLOYEE_NAMES, FACILITIES
+
+# Syrian mobile prefixes used as employee ID prefixes
+MOBILE_PREFIXES = ['0944', '0945', '0946', '0947', '0948', '0949',  # MTN
+                   '0954', '0955', '0956', '0957', '0958', '0959',  # Syriatel
+                   '0962', '0963', '0964', '0965', '0966', '0967']  # Other networks
+
+# Employee columns copied onto every daily report
+DAILY_EMPLOYEE_COLUMNS = [
+    'معرف الموظف', 'الاسم', 'المنشأة', 'القسم',
+    'المشروع الحالي', 'المهمة الحالية', 'تقدم المهمة'
+]
+
+
+def _choice(rng, values, size):
+    """Draw `size` values uniformly from `values` as a pandas array"""
+    return pd.array(values)[rng.integers(0, len(values), size)]
+
+
+def _category(rng, column, size):
+    """Draw `size` values of a schema category column, built directly from codes"""
+    dtype = CATEGORY_DTYPES[column]
+    return pd.Categorical.from_codes(rng.integers(0, len(dtype.categories), size), dtype=dtype)
+
+
+def _percent_choice(rng, low, high, size):
+    """Draw `size` "NN%" strings for integers in [low, high)"""
+    return _choice(rng, [f"{value}%" for value in range(low, high)], size)
+
+
+def generate_syrian_mobiles(rng, size):
+    """Generate `size` distinct Syrian mobile numbers to use as employee IDs"""
+    suffix_space = 10 ** 6
+    numbers = rng.choice(len(MOBILE_PREFIXES) * suffix_space, size=size, replace=False)
+    prefixes = np.asarray(MOBILE_PREFIXES)[numbers // suffix_space]
+    suffixes = np.char.zfill((numbers % suffix_space).astype(str), 6)
+    return np.char.add(prefixes, suffixes)
+
+
+def generate_employees(rng, n_employees):
+    """Generate the employees frame column-wise"""
+    return pd.DataFrame({
+        'معرف الموظف': generate_syrian_mobiles(rng, n_employees),
+        'الاسم': _choice(rng, EMPLOYEE_NAMES, n_employees),
+        'المنشأة': _category(rng, 'المنشأة', n_employees),
+        'القسم': _category(rng, 'القسم', n_employees),
+        'المسمى الوظيفي': _category(rng, 'المسمى الوظيفي', n_employees),
+        'المشروع الحالي': _category(rng, 'المشروع الحالي', n_employees),
+        'حالة المشروع': _category(rng, 'حالة المشروع', n_employees),
+        'المهمة الحالية': _category(rng, 'المهمة الحالية', n_employees),
+        'تقدم المهمة': rng.integers(10, 96, n_employees)
+    })
+
+
+def generate_daily_reports(rng, employees, n_reports, history_days=30):
+    """Generate daily reports for randomly drawn employees over the last `history_days` days"""
+    reporter_rows = rng.integers(0, len(employees), n_reports)
+    today = np.datetime64('today', 'D')
+    days = (today - np.arange(history_days + 1)).astype('datetime64[ns]')
+    start_times = [f"{hour}:{minute:02d}" for hour in range(7, 10) for minute in range(60)]
+
+    daily = pd.DataFrame({'التاريخ': _choice(rng, days, n_reports)})
+    for column in DAILY_EMPLOYEE_COLUMNS:
+        daily[column] = employees[column].array[reporter_rows]
+    daily['موقع العمل'] = _category(rng, 'موقع العمل', n_reports)
+    daily['وقت بدء العمل'] = _choice(rng, start_times, n_reports)
+    daily['المهام المخطط لها'] = _category(rng, 'المهام المخطط لها', n_reports)
+    daily['حالة مهام الأمس'] = _category(rng, 'حالة مهام الأمس', n_reports)
+    daily['التحديات'] = _category(rng, 'التحديات', n_reports)
+    daily['نسبة الإنجاز'] = rng.integers(60, 101, n_reports)
+    daily['ساعات العمل'] = rng.integers(6, 13, n_reports)
+    return daily
+
+
+def generate_weekly_reports(rng, employees, n_reports, history_weeks=8):
+    """Generate weekly reports for randomly drawn employees over the last `history_weeks` weeks"""
+    reporter_rows = rng.integers(0, len(employees), n_reports)
+    today = np.datetime64('today', 'D')
+    week_starts = np.datetime_as_string(today - 7 * np.arange(history_weeks + 1), unit='D')
+
+    return pd.DataFrame({
+        'الأسبوع': _choice(rng, week_starts, n_reports),
+        'معرف الموظف': employees['معرف الموظف'].array[reporter_rows],
+        'الاسم': employees['الاسم'].array[reporter_rows],
+        'المنشأة': employees['المنشأة'].array[reporter_rows],
+        'المشاريع النشطة': rng.integers(1, 6, n_reports),
+        'المهام المكتملة': rng.integers(15, 36, n_reports),
+        'المهام قيد التنفيذ': rng.integers(3, 11, n_reports),
+        'المهام المتأخرة': rng.integers(0, 6, n_reports),
+        'تقييم الأداء': _category(rng, 'تقييم الأداء', n_reports),
+        'معدل الحضور': _percent_choice(rng, 85, 101, n_reports)
+    })
+
+
+def generate_demo_data(n_employees=200, n_daily_reports=150, n_weekly_reports=80, seed=None):
+    """Generate the demo dataset in bulk; the same seed always yields the same rows (dates relative to today)"""
+    rng = np.random.default_rng(seed)
+    employees = generate_employees(rng, n_employees)
+
+    return {
+        'employees': employees,
+        'daily_reports': generate_daily_reports(rng, employees, n_daily_reports),
+        'weekly_reports': generate_weekly_reports(rng, employees, n_weekly_reports),
+        'facilities': list(FACILITIES)
+    }
@@ -0,0 +1,180 @@
+import argparse
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import closing
+
+import pandas as pd
+
+import settings
+from data_generator import generate_demo_data
+
+TABLES = ('employees', 'daily_reports', 'weekly_reports')
+
+# Columns the dashboard reads from each table; the rest are never loaded
+DASHBOARD_COLUMNS = {
+    'employees': ['المنشأة', 'القسم', 'المشروع الحالي', 'حالة المشروع', 'تقدم المهمة', 'معرف الموظف', 'الاسم',
+                  'المسمى الوظيفي', 'المهمة الحالية'],
+    'daily_reports': ['المنشأة', 'القسم', 'نسبة الإنجاز', 'التاريخ', 'معرف الموظف', 'موقع العمل', 'التحديات',
+                      'الاسم', 'المهمة الحالية', 'حالة مهام الأمس', 'المشروع الحالي', 'تقدم المهمة'],
+    'weekly_reports': ['المنشأة', 'الأسبوع', 'معرف الموظف', 'الاسم', 'المهام المتأخرة']
+}
+
+
+def columns_for(table):
+    """Return the columns the dashboard reads from `table`"""
+    return list(DASHBOARD_COLUMNS[table])
+
+
+class DataSource(ABC):
+    """Base class for the backends the dashboard reads its tables from"""
+
+    @abstractmethod
+    def load(self, table, columns=None):
+        """Load `table`, keeping only `columns`"""
+
+    @abstractmethod
+    def facilities(self):
+        """Return the ordered list of facilities"""
+
+    def modified_at(self):
+        """When the stored tables last changed (a timestamp), or None for a source that never changes"""
+        return None
+
+
+class DemoDataSource(DataSource):
+    """In-process synthetic dataset from data_generator"""
+
+    def __init__(self, n_employees=200, n_daily_reports=150, n_weekly_reports=80, seed=None):
+        self._data = generate_demo_data(n_employees, n_daily_reports, n_weekly_reports, seed)
+
+    def load(self, table, columns=None):
+        frame = self._data[table]
+        return frame[columns] if columns else frame
+
+    def facilities(self):
+        return list(self._data['facilities'])
+
+
+class ParquetDataSource(DataSource):
+    """Columnar dataset stored as one Parquet file per table
+
+    Only the requested columns are read from each file.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, table):
+        return os.path.join(self.directory, f"{table}.parquet")
+
+    def load(self, table, columns=None):
+        return pd.read_parquet(self._path(table), engine='pyarrow', columns=columns)
+
+    def facilities(self):
+        return pd.read_parquet(self._path('facilities'), engine='pyarrow')['المنشأة'].tolist()
+
+    def modified_at(self):
+        return max(os.path.getmtime(self._path(table)) for table in TABLES + ('facilities',))
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+class SQLiteDataSource(DataSource):
+    """Tables stored in one SQLite database file
+
+    Only the requested columns are selected, and daily reports are read in
+    date order. Like the other sources it loads whole tables into the
+    Dataset; the sidebar filters still run in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _query(self, sql):
+        # Tables are read once per (re)load, so each query opens its own read-only connection
+        uri = f"file:{os.path.abspath(self.path)}?mode=ro"
+        with closing(sqlite3.connect(uri, uri=True)) as connection:
+            return pd.read_sql_query(sql, connection)
+
+    def load(self, table, columns=None):
+        select = ', '.join(_quote(column) for column in columns) if columns else '*'
+        # Daily reports come back in date order, so the report store's sort has nothing to do
+        order = f" ORDER BY {_quote('التاريخ')}" if table == 'daily_reports' else ''
+        frame = self._query(f"SELECT {select} FROM {_quote(table)}{order}")
+        if 'التاريخ' in frame:
+            frame['التاريخ'] = pd.to_datetime(frame['التاريخ'])
+        return frame
+
+    def facilities(self):
+        return self._query('SELECT "المنشأة" FROM facilities ORDER BY rowid')['المنشأة'].tolist()
+
+    def modified_at(self):
+        # Writes in WAL mode land in the -wal file before the database file
+        paths = [path for path in (self.path, f"{self.path}-wal") if os.path.exists(path)]
+        return max(os.path.getmtime(path) for path in paths) if paths else os.path.getmtime(self.path)
+
+
+def write_parquet_dataset(source, directory, row_group_size=100_000):
+    """Copy every table of `source` into `directory` as Parquet files
+
+    Daily reports are written in date order, the order the report store keeps them in.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for table in TABLES:
+        frame = source.load(table)
+        if table == 'daily_reports':
+            frame = frame.sort_values('التاريخ', kind='stable')
+        frame.to_parquet(os.path.join(directory, f"{table}.parquet"),
+                         engine='pyarrow', index=False, row_group_size=row_group_size)
+    pd.DataFrame({'المنشأة': source.facilities()}).to_parquet(
+        os.path.join(directory, 'facilities.parquet'), engine='pyarrow', index=False)
+
+
+def write_sqlite_dataset(source, path):
+    """Copy every table of `source` into a SQLite database file"""
+    if os.path.exists(path):
+        os.remove(path)
+    with sqlite3.connect(path) as connection:
+        for table in TABLES:
+            frame = source.load(table)
+            if table == 'daily_reports':
+                frame = frame.sort_values('التاريخ', kind='stable')
+                frame = frame.assign(**{'التاريخ': frame['التاريخ'].dt.strftime('%Y-%m-%d')})
+            frame.to_sql(table, connection, index=False, chunksize=100_000)
+        pd.DataFrame({'المنشأة': source.facilities()}).to_sql('facilities', connection, index=False)
+    connection.close()
+
+
+def get_data_source():
+    """Return the data source configured in settings"""
+    if settings.DATABASE_PATH:
+        return SQLiteDataSource(settings.DATABASE_PATH)
+    if settings.DATA_DIR:
+        return ParquetDataSource(settings.DATA_DIR)
+    return DemoDataSource(
+        n_employees=settings.DEMO_EMPLOYEES,
+        n_daily_reports=settings.DEMO_DAILY_REPORTS,
+        n_weekly_reports=settings.DEMO_WEEKLY_REPORTS,
+        seed=settings.DEMO_SEED
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the demo dataset as a Parquet data directory or SQLite database")
+    parser.add_argument("directory", help="output directory, or database file with --sqlite")
+    parser.add_argument("--sqlite", action="store_true", help="write a SQLite database instead of Parquet files")
+    parser.add_argument("--employees", type=int, default=settings.DEMO_EMPLOYEES)
+    parser.add_argument("--daily-reports", type=int, default=settings.DEMO_DAILY_REPORTS)
+    parser.add_argument("--weekly-reports", type=int, default=settings.DEMO_WEEKLY_REPORTS)
+    parser.add_argument("--seed", type=int, default=settings.DEMO_SEED)
+    parser.add_argument("--row-group-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    demo = DemoDataSource(args.employees, args.daily_reports, args.weekly_reports, args.seed)
+    if args.sqlite:
+        write_sqlite_dataset(demo, args.directory)
+    else:
+        write_parquet_dataset(demo, args.directory, args.row_group_size)
@@ -0,0 +1,170 @@
+import copy
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from alert_engine import AlertEngine
+from cube import build_employee_cube, build_report_cube
+from daily_store import DailyReportStore
+from data_source import TABLES, columns_for
+from latest_reports import LatestReportIndex
+from schema import CATEGORY_DTYPES, apply_schema, encode, extend_dtypes
+from search_index import EmployeeSearchIndex
+
+
+def filter_rows(frame, rows, column, values):
+    """Keep the row positions whose category in `column` is one of `values`
+
+    The test runs on the integer category codes of just those rows, so no
+    frame or string column is materialized.
+    """
+    series = frame[column]
+    categories = series.cat.categories
+    # One extra False slot at the end, which code -1 (missing) indexes
+    wanted = np.zeros(len(categories) + 1, dtype=bool)
+    positions = categories.get_indexer(list(values))
+    wanted[positions[positions >= 0]] = True
+    return rows[wanted[series.cat.codes.to_numpy()[rows]]]
+
+
+class Dataset:
+    """The loaded tables plus every index and aggregate derived from them
+
+    One Dataset is shared read-only by every session. Filters return row
+    positions into its frames rather than filtered copies, so a session
+    only materializes the rows it actually renders.
+
+    A Dataset is never changed once built. Appending a report batch returns
+    a new snapshot whose report store, report cube, latest-report index and
+    alert engine fold in just the batch, sharing every untouched frame and
+    index with this one, and whose `version` differs so cached summaries
+    keyed on it are not reused for the new data.
+
+    With `build_cubes=False` the cubes are left to a ShardPool, which
+    builds them per shard in its worker processes, and `cubes` is None.
+    """
+
+    def __init__(self, employees, daily_reports, weekly_reports, facilities, build_cubes=True):
+        data = apply_schema({
+            'employees': employees, 'daily_reports': daily_reports, 'weekly_reports': weekly_reports
+        })
+        # Positional index, so search results and filtered rows are interchangeable
+        self.employees = data['employees'].reset_index(drop=True)
+        self.daily = DailyReportStore(data['daily_reports'])
+        self.weekly = data['weekly_reports']
+        self.facilities = list(facilities)
+        self.dtypes = {
+            column: frame[column].dtype
+            for frame in data.values() for column in frame.columns if column in CATEGORY_DTYPES
+        }
+
+        self.cubes = {
+            'employees': build_employee_cube(self.employees),
+            'daily_reports': build_report_cube(self.daily)
+        } if build_cubes else None
+        self.latest_reports = LatestReportIndex(self.daily.frame)
+        self.search_index = EmployeeSearchIndex(self.employees)
+        self.alerts = AlertEngine()
+        self.alerts.add_daily(self.daily.frame)
+        self.alerts.add_weekly(self._with_departments(self.weekly))
+
+        self._loaded_at = datetime.now().isoformat()
+        self._batches = 0
+
+    @classmethod
+    def from_source(cls, source, build_cubes=True):
+        """Load the columns the dashboard sections read from a DataSource"""
+        tables = {table: source.load(table, columns=columns_for(table)) for table in TABLES}
+        return cls(tables['employees'], tables['daily_reports'], tables['weekly_reports'], source.facilities(),
+                   build_cubes)
+
+    @property
+    def version(self):
+        """Changes on reload and on every appended batch"""
+        return f"{self._loaded_at}:{self._batches}"
+
+    def employee_rows(self, facilities=None, departments=None):
+        """Positions of the employees in the selected facilities and departments"""
+        rows = np.arange(len(self.employees))
+        if facilities:
+            rows = filter_rows(self.employees, rows, 'المنشأة', facilities)
+        if departments:
+            rows = filter_rows(self.employees, rows, 'القسم', departments)
+        return rows
+
+    def daily_rows(self, start=None, end=None, facilities=None, departments=None):
+        """Positions in the date-sorted report store of the selected reports, oldest first"""
+        first, stop = self.daily.bounds(start, end)
+        rows = np.arange(first, stop)
+        if facilities:
+            rows = filter_rows(self.daily.frame, rows, 'المنشأة', facilities)
+        if departments:
+            rows = filter_rows(self.daily.frame, rows, 'القسم', departments)
+        return rows
+
+    def _with_batch(self, reports):
+        """A shallow copy of the dataset for one more batch, and the batch encoded with its category dtypes
+
+        Dtypes are widened for values the batch adds, recasting the copy's
+        frames; existing codes stay valid when categories are only appended.
+        """
+        snapshot = copy.copy(self)
+        snapshot._batches = self._batches + 1
+        dtypes = extend_dtypes(self.dtypes, reports)
+        widened = {column for column, dtype in dtypes.items() if dtype != self.dtypes[column]}
+        if widened:
+            casts = lambda frame: {column: dtypes[column] for column in widened if column in frame}
+            snapshot.employees = self.employees.astype(casts(self.employees))
+            snapshot.daily = self.daily.astype(casts(self.daily.frame))
+            snapshot.weekly = self.weekly.astype(casts(self.weekly))
+            snapshot.dtypes = dtypes
+        return snapshot, encode(reports, dtypes)
+
+    def with_daily(self, reports):
+        """A new snapshot with a validated batch of daily reports folded into the store, cube, indexes and alerts"""
+        snapshot, batch = self._with_batch(reports)
+        snapshot.daily = snapshot.daily.appended(batch)
+        if self.cubes is not None:
+            snapshot.cubes = dict(self.cubes, daily_reports=self.cubes['daily_reports'].merge(
+                build_report_cube(DailyReportStore(batch))
+            ))
+        snapshot.latest_reports = self.latest_reports.copy()
+        snapshot.latest_reports.update(batch)
+        snapshot.alerts = self.alerts.copy()
+        snapshot.alerts.add_daily(batch)
+        return snapshot
+
+    def with_weekly(self, reports):
+        """A new snapshot with a validated batch of weekly reports folded into the weekly table and alerts"""
+        snapshot, batch = self._with_batch(reports)
+        snapshot.weekly = pd.concat([snapshot.weekly, batch], ignore_index=True)
+        snapshot.alerts = self.alerts.copy()
+        snapshot.alerts.add_weekly(snapshot._with_departments(batch))
+        return snapshot
+
+    def _with_departments(self, weekly):
+        """Weekly reports with each reporter's department from the employees table, for alerts"""
+        departments = self.employees.drop_duplicates('معرف الموظف').set_index('معرف الموظف')['القسم']
+        return weekly.assign(**{'القسم': weekly['معرف الموظف'].map(departments).astype(departments.dtype)})
+
+
+class SharedDataset:
+    """The Dataset snapshot every session reads, replaced whole when report files are ingested
+
+    The new snapshot is built beside the current one and swapped in with a
+    single assignment, so a session that has already read the current
+    snapshot keeps a consistent view of it for the rest of its rerun.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._lock = threading.Lock()
+
+    def ingest(self, inbox):
+        """Append the inbox's pending files; returns the snapshot to read and the per-file results"""
+        with self._lock:
+            snapshot, results = inbox.ingest(self.snapshot)
+            self.snapshot = snapshot
+        return snapshot, results
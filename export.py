@@ -0,0 +1,54 @@
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import settings
+
+
+def iter_chunks(frame, rows, columns, chunk_rows=None):
+    """Yield the selected rows and columns of `frame` a batch at a time"""
+    chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+    for first in range(0, len(rows), chunk_rows):
+        yield frame.iloc[rows[first:first + chunk_rows]][columns]
+
+
+def write_csv(chunks, handle):
+    """Write chunks as one UTF-8 CSV (with a BOM so spreadsheet apps detect Arabic text)"""
+    handle.write('\ufeff'.encode('utf-8'))
+    for number, chunk in enumerate(chunks):
+        handle.write(chunk.to_csv(index=False, header=number == 0, date_format='%Y-%m-%d').encode('utf-8'))
+
+
+def write_parquet(chunks, handle):
+    """Write chunks as consecutive row groups of one Parquet file"""
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(handle, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+# Export format → (file extension, mime type, writer)
+FORMATS = {
+    'csv': ('csv', 'text/csv', write_csv),
+    'parquet': ('parquet', 'application/vnd.apache.parquet', write_parquet)
+}
+
+
+def export_file(frame, rows, columns, fmt):
+    """Stream the selected rows of `frame` through a temporary file in `fmt` and return its bytes
+
+    Rows are converted and written one chunk at a time, so the whole
+    selection is never materialized as a DataFrame or encoded string; only
+    the finished file is read back, as the bytes Streamlit serves.
+    """
+    with tempfile.TemporaryFile() as handle:
+        FORMATS[fmt][2](iter_chunks(frame, rows, columns), handle)
+        handle.seek(0)
+        return handle.read()
@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+UNKNOWN_MANAGER = "غير محدد"
+
+
+@dataclass(frozen=True)
+class FacilityRecord:
+    """A facility and its manager's contact details"""
+    name: str
+    manager_name: str
+    manager_phone: str
+
+
+# Facility managers (simulated with realistic data)
+_FACILITY_MANAGERS = [
+    ("مستشفى الأسد الجامعي", "د. محمد الأسود", "0944123456"),
+    ("مستشفى المواساة الجامعي", "د. فاطمة حمود", "0955234567"),
+    ("مستشفى الأطفال الجامعي", "د. خالد شاهين", "0946345678"),
+    ("مستشفى دمشق (ابن النفيس)", "د. نور عبد الله", "0957456789"),
+    ("مستشفى الولادة الجامعي", "د. رنا المصري", "0944567890"),
+    ("مستشفى العيون الجامعي", "د. عمر الخوري", "0955678901"),
+    ("مستشفى الأورام", "د. ليلى نجار", "0946789012"),
+    ("مستشفى الباسل للقلب", "د. سامر عثمان", "0957890123"),
+    ("مستشفى الشهيد يوسف العظمة", "د. هند زيدان", "0944901234"),
+    ("مستشفى الهلال الأحمر", "د. أحمد الحلبي", "0955012345"),
+    ("مركز الشام الصحي", "د. مريم عبد الرحمن", "0946123456"),
+    ("مركز دوما الصحي", "د. وليد الأسود", "0957234567"),
+    ("مركز جرمانا الصحي", "أ. سعاد مرعي", "0944345678"),
+    ("مركز الميدان الصحي", "أ. حسام طالب", "0955456789"),
+    ("مركز القابون الصحي", "أ. نادية حداد", "0946567890"),
+    ("مركز صحي باب توما", "د. باسل الشعار", "0957678901"),
+    ("مركز صحي القصاع", "د. رامي الحكيم", "0944789012"),
+    ("مركز صحي الزاهرة", "د. سلمى الترك", "0955890123"),
+    ("إدارة المديرية الرئيسية", "د. أكرم معتوق", "0946901234"),
+    ("قسم الطوارئ المركزي", "د. عماد البيطار", "0957012345"),
+    ("مختبر الصحة العامة", "د. منى الصباغ", "0944123789"),
+    ("مركز مكافحة الأمراض", "د. جهاد الأتاسي", "0955234890")
+]
+
+# Built once at import and shared by every view
+FACILITY_DIRECTORY = {
+    name: FacilityRecord(name, manager_name, manager_phone)
+    for name, manager_name, manager_phone in _FACILITY_MANAGERS
+}
+
+DIRECTORY_FRAME = pd.DataFrame(
+    {
+        'مدير المنشأة': [record.manager_name for record in FACILITY_DIRECTORY.values()],
+        'هاتف المدير': [record.manager_phone for record in FACILITY_DIRECTORY.values()]
+    },
+    index=pd.Index(list(FACILITY_DIRECTORY), name='المنشأة')
+)
+
+
+def with_managers(frame):
+    """Join each row's facility manager name and phone onto `frame`
+
+    The join goes through the facility column's categories when it is
+    categorical, so the cost is per facility rather than per row.
+    """
+    facility = frame['المنشأة']
+    joined = {}
+    for column in DIRECTORY_FRAME.columns:
+        values = facility.map(DIRECTORY_FRAME[column])
+        joined[column] = values.astype(object).where(values.notna(), UNKNOWN_MANAGER if column == 'مدير المنشأة' else "")
+    return frame.assign(**joined)
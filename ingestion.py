@@ -0,0 +1,149 @@
+import os
+import threading
+
+import pandas as pd
+
+from data_source import columns_for
+from schema import parse_percent
+
+# File name prefix → table a dropped report file is appended to
+FILE_TABLES = {'daily_': 'daily_reports', 'weekly_': 'weekly_reports'}
+FILE_EXTENSIONS = ('.csv', '.jsonl')
+
+# Columns checked for well-formed values before a batch is accepted
+DATE_COLUMNS = {'daily_reports': ['التاريخ'], 'weekly_reports': ['الأسبوع']}
+INTEGER_COLUMNS = {'daily_reports': ['نسبة الإنجاز'], 'weekly_reports': ['المهام المتأخرة']}
+
+# Read as text so phone-number IDs keep their leading zero
+TEXT_COLUMNS = {'معرف الموظف': str}
+
+
+class IngestionError(ValueError):
+    """A report file that cannot be appended to the dataset"""
+
+
+def table_for(filename):
+    """Return the table a report file belongs to, or None for files the inbox ignores"""
+    name = os.path.basename(filename)
+    if name.startswith('.') or not name.endswith(FILE_EXTENSIONS):
+        return None
+    for prefix, table in FILE_TABLES.items():
+        if name.startswith(prefix):
+            return table
+    return None
+
+
+def read_batch(path):
+    """Read a CSV or JSON Lines report file into a DataFrame"""
+    try:
+        if path.endswith('.jsonl'):
+            return pd.read_json(path, lines=True, dtype=TEXT_COLUMNS)
+        return pd.read_csv(path, dtype=TEXT_COLUMNS, encoding='utf-8-sig')
+    except ValueError as error:
+        raise IngestionError(f"cannot parse {os.path.basename(path)}: {error}") from error
+
+
+def validate(frame, table):
+    """Check a batch against the columns the dashboard reads and return it with parsed values
+
+    Extra columns are dropped; missing columns, empty values, unparseable
+    dates and non-integer counts raise IngestionError.
+    """
+    columns = columns_for(table)
+    missing = [column for column in columns if column not in frame]
+    if missing:
+        raise IngestionError(f"missing columns: {', '.join(missing)}")
+    frame = frame[columns]
+    empty = [column for column in columns if frame[column].isna().any()]
+    if empty:
+        raise IngestionError(f"empty values in: {', '.join(empty)}")
+
+    parsed = {}
+    for column in DATE_COLUMNS[table]:
+        dates = pd.to_datetime(frame[column], errors='coerce')
+        if dates.isna().any():
+            raise IngestionError(f"invalid dates in {column}")
+        # Weekly reports keep their week as a date string, like the loaded data
+        parsed[column] = dates.dt.normalize() if table == 'daily_reports' else dates.dt.strftime('%Y-%m-%d')
+    for column in INTEGER_COLUMNS[table]:
+        numbers = pd.to_numeric(frame[column], errors='coerce')
+        if numbers.isna().any() or (numbers % 1 != 0).any():
+            raise IngestionError(f"non-integer values in {column}")
+        parsed[column] = numbers.astype('int64')
+    if 'تقدم المهمة' in frame:
+        try:
+            parsed['تقدم المهمة'] = parse_percent(frame['تقدم المهمة'])
+        except ValueError as error:
+            raise IngestionError("invalid percentages in تقدم المهمة") from error
+    parsed['معرف الموظف'] = frame['معرف الموظف'].astype(str)
+    return frame.assign(**parsed)
+
+
+class ReportInbox:
+    """Directory that report files are dropped into for appending to a Dataset
+
+    Files named daily_*.csv / daily_*.jsonl or weekly_*.csv / weekly_*.jsonl
+    are validated and appended, then moved to processed/; files that fail
+    validation go to rejected/ next to a .error.txt explaining why. Writers
+    should create files under a dot-prefixed name and rename them when
+    complete, since dot files are ignored.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.processed_dir = os.path.join(directory, 'processed')
+        self.rejected_dir = os.path.join(directory, 'rejected')
+        self._lock = threading.Lock()
+
+    def pending(self):
+        """Report files waiting in the inbox, oldest name first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            entry.path for entry in os.scandir(self.directory)
+            if entry.is_file() and table_for(entry.name)
+        )
+
+    @staticmethod
+    def _append(dataset, table, batch):
+        if table == 'daily_reports':
+            return dataset.with_daily(batch)
+        return dataset.with_weekly(batch)
+
+    def _move(self, path, directory):
+        os.makedirs(directory, exist_ok=True)
+        target = os.path.join(directory, os.path.basename(path))
+        os.replace(path, target)
+        return target
+
+    def ingest(self, dataset):
+        """Append every pending file to `dataset`
+
+        Returns the resulting Dataset snapshot (`dataset` itself when nothing
+        was appended) and (file name, rows or error) pairs.
+        """
+        results = []
+        with self._lock:
+            for path in self.pending():
+                table = table_for(path)
+                try:
+                    batch = validate(read_batch(path), table)
+                except IngestionError as error:
+                    target = self._move(path, self.rejected_dir)
+                    with open(target + '.error.txt', 'w', encoding='utf-8') as handle:
+                        handle.write(f"{error}\n")
+                    results.append((os.path.basename(path), error))
+                    continue
+                dataset = self._append(dataset, table, batch)
+                self._move(path, self.processed_dir)
+                results.append((os.path.basename(path), len(batch)))
+        return dataset, results
+
+    def replay(self, dataset, filenames):
+        """Return `dataset` with the named processed files appended again, e.g. to one just reloaded from the data source"""
+        with self._lock:
+            for filename in filenames:
+                path = os.path.join(self.processed_dir, filename)
+                table = table_for(path)
+                dataset = self._append(dataset, table, validate(read_batch(path), table))
+        return dataset
@@ -0,0 +1,40 @@
+class LatestReportIndex:
+    """Each employee's most recent daily report, keyed by employee ID
+
+    Built once from the loaded reports and updated batch by batch as new
+    reports arrive. A stored report is only replaced by one dated the same
+    day or later, so "latest" follows the report date rather than the
+    order batches or rows were appended in.
+    """
+
+    COLUMNS = ['التاريخ', 'موقع العمل', 'التحديات']
+
+    def __init__(self, reports=None):
+        self._latest = {}
+        if reports is not None:
+            self.update(reports)
+
+    def __len__(self):
+        return len(self._latest)
+
+    def __contains__(self, employee_id):
+        return employee_id in self._latest
+
+    def copy(self):
+        """Return an independent copy, so a batch can be folded into it without changing this index"""
+        index = LatestReportIndex()
+        index._latest = dict(self._latest)
+        return index
+
+    def update(self, reports):
+        """Fold a batch of daily reports into the index"""
+        newest = reports.sort_values('التاريخ', kind='stable').drop_duplicates('معرف الموظف', keep='last')
+        for report in newest[['معرف الموظف'] + self.COLUMNS].to_dict('records'):
+            employee_id = report.pop('معرف الموظف')
+            current = self._latest.get(employee_id)
+            if current is None or report['التاريخ'] >= current['التاريخ']:
+                self._latest[employee_id] = report
+
+    def get(self, employee_id):
+        """Return the latest report of `employee_id` as a dict, or None"""
+        return self._latest.get(employee_id)
@@ -0,0 +1,176 @@
+import argparse
+import functools
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import settings
+
+# Session-state key holding the profiler of the session's latest full rerun
+SESSION_KEY = '_rerun_profiler'
+PERCENTILES = (50, 95)
+
+_logger = logging.getLogger('dashboard.profile')
+_logger.propagate = False
+_logger_lock = threading.Lock()
+
+
+def _log_record(record):
+    """Append one record to the rolling JSONL log, if one is configured"""
+    if not settings.PROFILE_LOG:
+        return
+    with _logger_lock:
+        if not _logger.handlers:
+            handler = RotatingFileHandler(settings.PROFILE_LOG, maxBytes=settings.PROFILE_LOG_MAX_BYTES,
+                                          backupCount=3, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            _logger.addHandler(handler)
+            _logger.setLevel(logging.INFO)
+    _logger.info(json.dumps(record, ensure_ascii=False))
+
+
+class ProfileHistory:
+    """Rolling window of recent rerun records, shared by every session"""
+
+    def __init__(self, size):
+        self._records = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self._records.append(record)
+
+    def percentiles(self):
+        """p50/p95 wall time in ms per section (and for whole reruns) over the window"""
+        with self._lock:
+            records = list(self._records)
+        return percentile_table(records)
+
+
+def percentile_table(records):
+    """p50/p95 wall time in ms per section from rerun and fragment records"""
+    times = {}
+    for record in records:
+        if record['kind'] == 'rerun':
+            times.setdefault('rerun', []).append(record['total_ms'])
+        for name, stats in record['sections'].items():
+            times.setdefault(name, []).append(stats['ms'])
+    return pd.DataFrame(
+        {f"p{q}_ms": [np.percentile(values, q) for values in times.values()] for q in PERCENTILES},
+        index=pd.Index(list(times), name='section')
+    ).assign(runs=[len(values) for values in times.values()])
+
+
+class RerunProfiler:
+    """Wall time and allocated memory of each dashboard section in one rerun
+
+    Memory comes from tracemalloc, which is process-wide, so with several
+    sessions rendering at once a section's figures include their allocations.
+    Each section also records `at_ms`, when it finished relative to the start
+    of the rerun. Sections timed after `finish` (fragment reruns) are
+    recorded on their own.
+    """
+
+    def __init__(self, history, memory=True):
+        self.history = history
+        self.memory = memory
+        self.sections = {}
+        self.finished = False
+        self.started = time.perf_counter()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def section(self, name):
+        if self.memory:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            stats = {'ms': round((ended - started) * 1000, 2), 'at_ms': round((ended - self.started) * 1000, 2)}
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                stats['alloc_kb'] = round((current - before) / 1024, 1)
+                stats['peak_kb'] = round((peak - before) / 1024, 1)
+            if self.finished:
+                self._emit('fragment', {name: stats}, stats['ms'])
+            else:
+                self.sections[name] = stats
+
+    def _emit(self, kind, sections, total_ms):
+        record = {'ts': datetime.now().isoformat(timespec='seconds'), 'kind': kind,
+                  'total_ms': total_ms, 'sections': sections}
+        self.history.add(record)
+        _log_record(record)
+        return record
+
+    def finish(self):
+        """Record the whole rerun and return its record"""
+        self.finished = True
+        return self._emit('rerun', self.sections, round((time.perf_counter() - self.started) * 1000, 2))
+
+
+@st.cache_resource
+def _shared_history():
+    return ProfileHistory(settings.PROFILE_HISTORY)
+
+
+def start_rerun():
+    """Start profiling this rerun when profiling is enabled; returns the profiler or None"""
+    if not settings.PROFILE:
+        return None
+    profiler = RerunProfiler(_shared_history(), settings.PROFILE_MEMORY)
+    st.session_state[SESSION_KEY] = profiler
+    return profiler
+
+
+def section(name):
+    """Context manager timing one section of the current rerun (a no-op when profiling is off)"""
+    profiler = st.session_state.get(SESSION_KEY) if settings.PROFILE else None
+    return profiler.section(name) if profiler is not None else nullcontext()
+
+
+def profiled(name):
+    """Decorator timing every call of a section render function, including fragment reruns"""
+    def decorate(render):
+        @functools.wraps(render)
+        def wrapper(*args, **kwargs):
+            with section(name):
+                return render(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def render_debug_panel(profiler):
+    """Sidebar panel with this rerun's section timings and p50/p95 across recent reruns"""
+    record = profiler.finish()
+    with st.sidebar.expander("🛠️ أداء العرض / Render Profile"):
+        st.caption(f"Rerun: {record['total_ms']:.0f} ms")
+        st.dataframe(pd.DataFrame(record['sections']).T, use_container_width=True)
+        st.caption("p50 / p95 (ms)")
+        st.dataframe(profiler.history.percentiles().round(1), use_container_width=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize p50/p95 section latency from profile JSONL logs")
+    parser.add_argument("logs", nargs="+")
+    args = parser.parse_args()
+
+    records = []
+    for path in args.logs:
+        with open(path, encoding='utf-8') as handle:
+            records.extend(json.loads(line) for line in handle if line.strip())
+    print(percentile_table(records).round(1).to_string())
@@ -0,0 +1,102 @@
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from dataset import Dataset
+from sharding import ShardPool
+
+# What a rerun reads: the Dataset and, when sharding, the ShardPool built from it
+Snapshot = namedtuple('Snapshot', ['dataset', 'shards'])
+
+
+class DatasetRefresher:
+    """Keeps a ready snapshot, rebuilt off the request path by a background thread
+
+    Every `interval` seconds the thread checks whether the data source has
+    changed and only then reloads it into a new Dataset (report store,
+    cubes, indexes, alerts). It appends the inbox's pending files, and with
+    `shards` set builds the snapshot's ShardPool too. A new snapshot is
+    swapped in with a single attribute assignment, so reruns read either
+    the previous snapshot or the new one and never wait on a rebuild; when
+    nothing changed the snapshot, and every summary cached on its version,
+    is kept. A failed rebuild keeps the previous snapshot and is reported
+    in `last_error`.
+
+    Inbox files are never written to the source, so every file appended
+    since the refresher started is tracked and appended again after each
+    reload. `last_ingest` holds the results of the latest ingest that
+    found files, numbered so each one can be shown once.
+    """
+
+    def __init__(self, source, interval, inbox=None, shards=0):
+        self.source = source
+        self.interval = interval
+        self.inbox = inbox
+        self.shards = shards
+        self.last_ingest = (0, [])
+        self.last_error = None
+        # Names of the inbox files appended since the refresher started, in order
+        self._files = []
+        self._retired = None
+        # The first snapshot is built before the dashboard can render anything
+        self._modified = source.modified_at()
+        self.snapshot = self._snapshot(self._ingest(self._load()))
+        self.refreshed_at = datetime.now()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='dataset-refresher', daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        return Dataset.from_source(self.source, build_cubes=not self.shards)
+
+    def _ingest(self, dataset):
+        """Append the inbox's pending files to `dataset`, remembering which ones it now holds"""
+        if self.inbox is None:
+            return dataset
+        dataset, results = self.inbox.ingest(dataset)
+        if results:
+            self._files.extend(name for name, result in results if isinstance(result, int))
+            # One assignment, so a rerun never reads a number with another ingest's results
+            self.last_ingest = (self.last_ingest[0] + 1, results)
+        return dataset
+
+    def _snapshot(self, dataset):
+        shards = ShardPool(dataset.employees, dataset.daily.frame, self.shards) if self.shards else None
+        return Snapshot(dataset, shards)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def refresh(self):
+        """Reload the source if it changed, append pending inbox files, and swap in the result if anything did"""
+        try:
+            dataset = self.snapshot.dataset
+            modified = self.source.modified_at()
+            if modified != self._modified:
+                dataset = self._load()
+                if self._files:
+                    dataset = self.inbox.replay(dataset, self._files)
+                self._modified = modified
+            dataset = self._ingest(dataset)
+            if dataset is not self.snapshot.dataset:
+                self._swap(self._snapshot(dataset))
+        except Exception as error:
+            self.last_error = error
+            return
+        self.refreshed_at = datetime.now()
+        self.last_error = None
+
+    def _swap(self, snapshot):
+        # Reruns may still be reading the replaced pool, so it is shut down one swap later
+        if self._retired is not None:
+            self._retired.shutdown()
+        self._retired = self.snapshot.shards
+        self.snapshot = snapshot
+
+    def stop(self):
+        """Stop the thread and the worker processes of the current and replaced pools"""
+        self._stop.set()
+        for shards in (self._retired, self.snapshot.shards):
+            if shards is not None:
+                shards.shutdown()
@@ -0,0 +1,172 @@
+import pandas as pd
+
+# Real facilities in Damascus Health Directorate
+FACILITIES = [
+    "مستشفى الأسد الجامعي",
+    "مستشفى المواساة الجامعي",
+    "مستشفى الأطفال الجامعي",
+    "مستشفى دمشق (ابن النفيس)",
+    "مستشفى الولادة الجامعي",
+    "مستشفى العيون الجامعي",
+    "مستشفى الأورام",
+    "مستشفى الباسل للقلب",
+    "مستشفى الشهيد يوسف العظمة",
+    "مستشفى الهلال الأحمر",
+    "مركز الشام الصحي",
+    "مركز دوما الصحي",
+    "مركز جرمانا الصحي",
+    "مركز الميدان الصحي",
+    "مركز القابون الصحي",
+    "مركز صحي باب توما",
+    "مركز صحي القصاع",
+    "مركز صحي الزاهرة",
+    "إدارة المديرية الرئيسية",
+    "قسم الطوارئ المركزي",
+    "مختبر الصحة العامة",
+    "مركز مكافحة الأمراض"
+]
+
+# Real Syrian names
+EMPLOYEE_NAMES = [
+    "د. محمد أحمد السعيد", "د. فاطمة علي حمود", "د. خالد محمود شاهين",
+    "د. نور الدين عبد الله", "د. رنا صالح المصري", "د. عمر حسن الخوري",
+    "د. ليلى إبراهيم نجار", "د. سامر محمد عثمان", "د. هند فاروق زيدان",
+    "د. أحمد يوسف الحلبي", "د. مريم عبد الرحمن", "د. وليد محمد الأسود",
+    "أ. سعاد أحمد مرعي", "أ. حسام الدين طالب", "أ. نادية سليم حداد",
+    "ممرضة زينب علي", "ممرض محمد عماد", "ممرضة رغد حسن",
+    "فني أيمن الشامي", "فني سوسن الدمشقي", "إداري عدنان المقداد",
+    "إدارية رولا الخطيب", "محاسب غسان النابلسي", "أمن وليد الأحمد",
+    "عامل نظافة أبو أحمد", "سائق محمود الحوراني", "مشرف طارق العمري",
+    "د. باسل الشعار", "د. رامي الحكيم", "د. سلمى الترك",
+    "د. عماد البيطار", "د. منى الصباغ", "د. جهاد الأتاسي",
+    "أ. ياسمين العلي", "أ. معين الدندشي", "ممرضة أمل حيدر",
+    "فني كمال السوري", "إداري نبيل الشيخ", "محاسبة رنا الحموي",
+    "د. طلال المحمد", "د. نايا العبد الله", "ممرض سامي الحسن"
+]
+
+# Departments
+DEPARTMENTS = [
+    "الطوارئ", "الجراحة العامة", "الباطنة", "الأطفال", "النسائية والتوليد",
+    "العظام", "القلبية", "العصبية", "الجلدية", "العيون", "الأنف والأذن والحنجرة",
+    "التخدير", "الأشعة", "المختبر", "الصيدلة", "التمريض", "الإدارة",
+    "المحاسبة", "الأمن", "النظافة", "الصيانة", "السائقين", "الاستقبال"
+]
+
+# Job titles
+JOB_TITLES = [
+    "طبيب أخصائي", "طبيب مقيم", "طبيب عام", "رئيس قسم", "نائب رئيس قسم",
+    "ممرض أول", "ممرض", "فني مختبر", "فني أشعة", "صيدلاني",
+    "إداري", "محاسب", "مدير", "مشرف", "عامل نظافة", "سائق", "أمن"
+]
+
+# Work locations
+WORK_LOCATIONS = ["المكتب", "العيادة", "العمل الميداني", "عمل من المنزل", "مناوبة"]
+
+# Current projects and tasks
+CURRENT_PROJECTS = [
+    "مشروع تطوير قسم الطوارئ", "تحديث نظام المختبرات", "تدريب الكادر الطبي",
+    "مشروع التطعيم الشامل", "تطوير العيادات الخارجية", "نظام إدارة المرضى الإلكتروني",
+    "مشروع صحة المجتمع", "تحديث أجهزة الأشعة", "برنامج الجودة الطبية",
+    "مشروع الطب الوقائي", "تطوير قسم العمليات", "نظام الصيدلية الإلكتروني",
+    "مشروع التأهيل الطبي", "تحديث قسم القلبية", "برنامج التثقيف الصحي",
+    "مشروع رعاية الأمومة", "تطوير خدمات الأطفال", "نظام المواعيد الإلكتروني"
+]
+
+PROJECT_STATUSES = [
+    "بدء المشروع", "التخطيط", "قيد التنفيذ", "مرحلة التجريب",
+    "المراجعة النهائية", "قارب على الانتهاء", "متوقف مؤقتاً"
+]
+
+CURRENT_TASKS = [
+    "إعداد التقارير الطبية", "فحص المرضى الجدد", "متابعة العمليات الجراحية",
+    "تحديث قاعدة البيانات", "التدريب على النظام الجديد", "مراجعة البروتوكولات",
+    "إجراء الفحوصات المخبرية", "صيانة الأجهزة الطبية", "تنظيم المخزون الطبي",
+    "إعداد خطة العمل الشهرية", "متابعة المرضى المنومين", "تحضير العمليات",
+    "مراجعة ملفات المرضى", "تطوير الإجراءات", "التنسيق مع الأقسام الأخرى"
+]
+
+PLANNED_TASKS = [
+    "فحص المرضى الجدد", "متابعة المرضى المنومين", "العمليات الجراحية",
+    "التقارير الطبية", "الاجتماعات الإدارية", "التدريب المستمر",
+    "فحص الأشعة", "تحليل النتائج", "إدارة الصيدلية", "تنظيف الأقسام"
+]
+
+YESTERDAY_TASK_STATUSES = ["مكتملة", "مكتملة جزئياً", "متأخرة", "ملغاة"]
+
+CHALLENGES = [
+    "نقص في المعدات", "ازدحام المرضى", "نقص الكادر", "مشاكل تقنية",
+    "لا توجد تحديات", "تأخير في الفحوصات", "مشاكل في التنسيق"
+]
+
+PERFORMANCE_RATINGS = ["ممتاز", "جيد جداً", "جيد", "مقبول"]
+
+# Low-cardinality columns stored as categoricals; every frame carrying one
+# of these columns shares the same CategoricalDtype, so codes line up
+# across employees, daily reports and weekly reports
+CATEGORY_VOCABULARIES = {
+    'المنشأة': FACILITIES,
+    'القسم': DEPARTMENTS,
+    'المسمى الوظيفي': JOB_TITLES,
+    'المشروع الحالي': CURRENT_PROJECTS,
+    'حالة المشروع': PROJECT_STATUSES,
+    'المهمة الحالية': CURRENT_TASKS,
+    'موقع العمل': WORK_LOCATIONS,
+    'المهام المخطط لها': PLANNED_TASKS,
+    'حالة مهام الأمس': YESTERDAY_TASK_STATUSES,
+    'التحديات': CHALLENGES,
+    'تقييم الأداء': PERFORMANCE_RATINGS
+}
+
+CATEGORY_DTYPES = {
+    column: pd.CategoricalDtype(values) for column, values in CATEGORY_VOCABULARIES.items()
+}
+
+
+# Percentage columns stored as integers; sources that still carry "NN%" strings are parsed once on load
+PERCENT_COLUMNS = ['تقدم المهمة']
+
+
+def parse_percent(series):
+    """Convert a column of "NN%" strings (or numbers) to integers"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('int64')
+    return series.astype(str).str.rstrip('%').astype('int64')
+
+
+def extend_dtypes(dtypes, frame):
+    """Return `dtypes` with categories extended by any values `frame` carries beyond them"""
+    extended = dict(dtypes)
+    for column, dtype in dtypes.items():
+        if column in frame:
+            values = pd.unique(frame[column].dropna())
+            extra = sorted(value for value in values if value not in dtype.categories)
+            if extra:
+                extended[column] = pd.CategoricalDtype(list(dtype.categories) + extra)
+    return extended
+
+
+def shared_dtypes(frames):
+    """Return the category dtypes extended with any values the frames carry beyond the vocabularies"""
+    dtypes = dict(CATEGORY_DTYPES)
+    for frame in frames:
+        dtypes = extend_dtypes(dtypes, frame)
+    return dtypes
+
+
+def encode(frame, dtypes):
+    """Encode one frame's category columns with `dtypes` and its percentages as integers"""
+    frame = frame.astype({column: dtypes[column] for column in frame.columns if column in dtypes})
+    percents = {column: parse_percent(frame[column]) for column in PERCENT_COLUMNS if column in frame}
+    return frame.assign(**percents) if percents else frame
+
+
+def apply_schema(data):
+    """Encode category columns with one shared dtype per column and percentages as integers"""
+    dtypes = shared_dtypes(data.values())
+    return {table: encode(frame, dtypes) for table, frame in data.items()}
+
+
+def observed_counts(series):
+    """value_counts() without the zero rows categoricals report for unused categories"""
+    counts = series.value_counts()
+    return counts[counts > 0]
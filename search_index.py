@@ -0,0 +1,94 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+
+# Tashkeel marks, superscript alef and tatweel
+_DIACRITICS = re.compile('[\u064B-\u0652\u0670\u0640]')
+_LETTER_VARIANTS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ؤ': 'و', 'ئ': 'ي', 'ى': 'ي',
+    'ة': 'ه'
+})
+# Honorific prefixes such as "د." and "أ." (after alef normalization)
+_TITLE_PREFIX = re.compile(r'^(?:[دا]\.\s*)+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_arabic(text):
+    """Fold spelling variants so equivalent Arabic names compare equal
+
+    Strips diacritics and tatweel, unifies alef/hamza forms, taa marbuta and
+    alef maqsura, and drops leading "د." / "أ." titles.
+    """
+    text = _DIACRITICS.sub('', str(text)).translate(_LETTER_VARIANTS).lower()
+    text = _WHITESPACE.sub(' ', text).strip()
+    return _TITLE_PREFIX.sub('', text)
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class EmployeeSearchIndex:
+    """Search index over employee names and phone-number IDs
+
+    Names are normalized and indexed by character trigrams, so a query
+    only verifies the few names sharing all of its trigrams. IDs are kept
+    in a sorted array, which acts as a prefix trie: every ID starting with
+    a prefix lies in one contiguous range found by binary search.
+    Results are index labels of the frame the index was built from.
+    """
+
+    def __init__(self, employees):
+        labels = employees.index.to_numpy()
+
+        # Names repeat across employees, so index each distinct normalized name once
+        rows_by_name = defaultdict(list)
+        for label, name in zip(labels, employees['الاسم'].to_numpy()):
+            rows_by_name[normalize_arabic(name)].append(label)
+        self._names = list(rows_by_name)
+        self._name_rows = [np.asarray(rows_by_name[name]) for name in self._names]
+        postings = defaultdict(set)
+        for name_id, name in enumerate(self._names):
+            for gram in _trigrams(name):
+                postings[gram].add(name_id)
+        self._postings = dict(postings)
+
+        ids = employees['معرف الموظف'].to_numpy().astype(str)
+        order = np.argsort(ids, kind='stable')
+        self._ids = ids[order]
+        self._id_rows = labels[order]
+
+    def _match_names(self, query):
+        query = normalize_arabic(query)
+        if not query:
+            return []
+        grams = _trigrams(query)
+        if grams:
+            candidates = set.intersection(*(self._postings.get(gram, set()) for gram in grams))
+        else:
+            # Queries shorter than a trigram fall back to the distinct-name list
+            candidates = range(len(self._names))
+        return [self._name_rows[name_id] for name_id in candidates if query in self._names[name_id]]
+
+    def _match_id_prefix(self, prefix):
+        first = np.searchsorted(self._ids, prefix, side='left')
+        stop = np.searchsorted(self._ids, prefix + '\uffff', side='left')
+        return self._id_rows[first:stop]
+
+    def search(self, query):
+        """Return the labels of employees whose name contains, or whose ID starts with, `query`"""
+        query = query.strip()
+        matches = self._match_names(query)
+        digits = query.replace(' ', '')
+        if digits.isdigit():
+            matches.append(self._match_id_prefix(digits))
+            if not digits.startswith('0'):
+                # Allow numbers typed without the leading zero, e.g. "944..."
+                matches.append(self._match_id_prefix('0' + digits))
+        if not matches:
+            return np.array([], dtype=self._id_rows.dtype)
+        if len(matches) == 1:
+            return matches[0]
+        return np.unique(np.concatenate(matches))
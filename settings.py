@@ -0,0 +1,54 @@
+import os
+
+
+def _env_int(name, default):
+    """Read an integer setting from the environment"""
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+# Demo dataset size and seed (set DASHBOARD_DEMO_SEED for reproducible datasets)
+DEMO_EMPLOYEES = _env_int("DASHBOARD_DEMO_EMPLOYEES", 200)
+DEMO_DAILY_REPORTS = _env_int("DASHBOARD_DEMO_DAILY_REPORTS", 150)
+DEMO_WEEKLY_REPORTS = _env_int("DASHBOARD_DEMO_WEEKLY_REPORTS", 80)
+DEMO_SEED = _env_int("DASHBOARD_DEMO_SEED", None)
+
+# Parquet data directory; when unset the dashboard runs on generated demo data
+DATA_DIR = os.environ.get("DASHBOARD_DATA_DIR") or None
+
+# SQLite database file (takes precedence over DATA_DIR)
+DATABASE_PATH = os.environ.get("DASHBOARD_DATABASE") or None
+
+# Number of filter selections whose aggregates are kept in the LRU cache
+AGGREGATION_CACHE_ENTRIES = _env_int("DASHBOARD_AGGREGATION_CACHE_ENTRIES", 64)
+
+# Number of chart figures kept for reuse across reruns and sessions
+FIGURE_CACHE_ENTRIES = _env_int("DASHBOARD_FIGURE_CACHE_ENTRIES", 256)
+
+# Most points plotted in the completion-rate chart; longer ranges are bucketed by week or month
+TIMESERIES_MAX_POINTS = _env_int("DASHBOARD_TIMESERIES_MAX_POINTS", 120)
+
+# Team members rendered per page in the project detail panels
+TEAM_PAGE_SIZE = _env_int("DASHBOARD_TEAM_PAGE_SIZE", 20)
+
+# Directory polled for new daily_*/weekly_* report files (CSV or JSON Lines); ingestion is off when unset
+INBOX_DIR = os.environ.get("DASHBOARD_INBOX_DIR") or None
+
+# Rows converted per batch when exporting reports or directory results
+EXPORT_CHUNK_ROWS = _env_int("DASHBOARD_EXPORT_CHUNK_ROWS", 50_000)
+
+# Per-section render timing and memory, shown in a sidebar debug panel (set DASHBOARD_PROFILE=1)
+PROFILE = _env_int("DASHBOARD_PROFILE", 0) == 1
+# Trace allocated memory while profiling (tracemalloc slows rendering; set 0 to record wall time only)
+PROFILE_MEMORY = _env_int("DASHBOARD_PROFILE_MEMORY", 1) == 1
+# Reruns kept for the debug panel's p50/p95 latencies
+PROFILE_HISTORY = _env_int("DASHBOARD_PROFILE_HISTORY", 200)
+# Rolling JSON Lines log of profiled reruns, rotated at PROFILE_LOG_MAX_BYTES (three old files kept)
+PROFILE_LOG = os.environ.get("DASHBOARD_PROFILE_LOG") or None
+PROFILE_LOG_MAX_BYTES = _env_int("DASHBOARD_PROFILE_LOG_MAX_BYTES", 5_000_000)
+
+# Worker processes the sidebar aggregates are sharded across by facility; 0 computes them in-process
+SHARDS = _env_int("DASHBOARD_SHARDS", 0)
+
+# Seconds between background reloads of the data source (also when the inbox is polled); 0 loads once
+REFRESH_SECONDS = _env_int("DASHBOARD_REFRESH_SECONDS", 0)
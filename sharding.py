@@ -0,0 +1,119 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cube import build_employee_cube, build_report_cube, merge_rollups, summary_rollups
+from daily_store import DailyReportStore
+
+# Column the shards are partitioned on; all rows of one facility live in the same shard
+SHARD_COLUMN = 'المنشأة'
+# Report columns a shard's cube is built from
+REPORT_COLUMNS = ['المنشأة', 'القسم', 'التاريخ', 'نسبة الإنجاز']
+
+# The cubes of the shard held by this worker process
+_shard = None
+
+
+def assign_shards(weights, n_shards):
+    """Map each label of `weights` (a Series of row counts) to a shard, heaviest first onto the lightest shard"""
+    loads = np.zeros(n_shards)
+    assignment = {}
+    for label, weight in weights.sort_values(ascending=False, kind='stable').items():
+        shard = int(np.argmin(loads))
+        assignment[label] = shard
+        loads[shard] += weight
+    return assignment
+
+
+def _open_shard(employees, reports):
+    global _shard
+    _shard = (build_employee_cube(employees), build_report_cube(DailyReportStore(reports)))
+
+
+def _ready():
+    return _shard is not None
+
+
+def _shard_rollups(facilities, departments, start, end):
+    return summary_rollups(*_shard, facilities, departments, start, end)
+
+
+class ShardPool:
+    """Employees and daily reports partitioned by facility, one worker process per shard
+
+    Each worker builds the cubes of its own partition, so building scales
+    with the number of shards, and answers roll-up requests for it. A
+    request fans out to the shards holding the selected facilities and the
+    partial roll-ups are added together (counts and sums, never means).
+    """
+
+    def __init__(self, employees, reports, n_shards):
+        weights = (employees[SHARD_COLUMN].value_counts(sort=False)
+                   .add(reports[SHARD_COLUMN].value_counts(sort=False), fill_value=0))
+        assignment = assign_shards(weights[weights > 0], n_shards)
+        # Workers are forked: Streamlit registers the dashboard script as __main__, so spawned
+        # (or forkserver) workers would re-run it while preparing. They only ever run this module.
+        # Forking a threaded process (Streamlit's server, the refresher) copies only the forking
+        # thread: a lock another thread holds at that moment, say in logging or an allocator, stays
+        # held in the child for good, and a worker touching it hangs its shard's summaries. Python
+        # 3.12+ warns about this with a DeprecationWarning
+        context = multiprocessing.get_context('fork')
+        self.shards = []
+        for shard in sorted(set(assignment.values())):
+            facilities = {label for label, assigned in assignment.items() if assigned == shard}
+            executor = ProcessPoolExecutor(1, mp_context=context, initializer=_open_shard, initargs=(
+                employees[employees[SHARD_COLUMN].isin(facilities)],
+                reports.loc[reports[SHARD_COLUMN].isin(facilities), REPORT_COLUMNS]
+            ))
+            self.shards.append((facilities, executor))
+        # Workers start on their first task, so start them all before waiting on any
+        for future in [executor.submit(_ready) for _, executor in self.shards]:
+            future.result()
+
+    def rollups(self, facilities=None, departments=None, start=None, end=None):
+        """`summary_rollups` of the selection, merged across the shards holding its facilities"""
+        selected = set(facilities or ())
+        shards = [executor for held, executor in self.shards if not selected or held & selected]
+        futures = [executor.submit(_shard_rollups, facilities, departments, start, end)
+                   for executor in shards or [self.shards[0][1]]]
+        return merge_rollups([future.result() for future in futures])
+
+    def shutdown(self):
+        for _, executor in self.shards:
+            executor.shutdown(cancel_futures=True)
+
+
+class ShardPools:
+    """The ShardPool of the latest dataset version, shared by every session
+
+    A rerun that read the previous snapshot may still be waiting on its
+    pool when a newer version arrives, so a replaced pool is kept and only
+    shut down when the next one replaces it, one version late, as
+    DatasetRefresher does. A rerun that lags two versions behind gets a
+    pool of its own version rebuilt.
+    """
+
+    def __init__(self, n_shards):
+        self.n_shards = n_shards
+        self._lock = threading.Lock()
+        # version -> pool, the current one last
+        self._pools = {}
+
+    def get(self, dataset):
+        """The pool of `dataset`'s version, built (retiring the oldest kept pool) when it is new"""
+        with self._lock:
+            pool = self._pools.get(dataset.version)
+            if pool is None:
+                pool = ShardPool(dataset.employees, dataset.daily.frame, self.n_shards)
+                if len(self._pools) == 2:
+                    self._pools.pop(next(iter(self._pools))).shutdown()
+                self._pools[dataset.version] = pool
+            return pool
+
+    def shutdown(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.shutdown()
+            self._pools.clear()
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# Bucket sizes, finest first, as pandas period frequencies; weeks run Sunday to Saturday
+BUCKET_FREQUENCIES = {'day': 'D', 'week': 'W-SAT', 'month': 'M'}
+BUCKET_LABELS = {'day': 'Date', 'week': 'Week', 'month': 'Month'}
+
+
+def choose_bucket(start, end, max_points):
+    """Finest bucket size that keeps start..end within `max_points` buckets"""
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    if days <= max_points:
+        return 'day'
+    if days / 7 <= max_points:
+        return 'week'
+    return 'month'
+
+
+def bucket_stats(days, sums, counts, bucket):
+    """Per-bucket report-weighted mean, min/max of the daily means and report count
+
+    `days` is a sorted DatetimeIndex with one sum and one count per day.
+    Buckets are contiguous runs of days, so every statistic is a single
+    reduceat over the run boundaries.
+    """
+    observed = counts > 0
+    days, sums, counts = days[observed], sums[observed], counts[observed]
+    if not len(days):
+        return pd.DataFrame(columns=['mean', 'min', 'max', 'count'], index=pd.DatetimeIndex([], name='التاريخ'))
+    starts = days.to_period(BUCKET_FREQUENCIES[bucket]).start_time
+    boundaries = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    daily_means = sums / counts
+    bucket_counts = np.add.reduceat(counts, boundaries)
+    return pd.DataFrame({
+        'mean': np.add.reduceat(sums, boundaries) / bucket_counts,
+        'min': np.minimum.reduceat(daily_means, boundaries),
+        'max': np.maximum.reduceat(daily_means, boundaries),
+        'count': bucket_counts
+    }, index=starts[boundaries].rename('التاريخ'))
+
+
+def lttb(x, y, threshold):
+    """Positions of the points kept by Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last points and, from each of `threshold - 2`
+    equal buckets in between, the point forming the largest triangle with
+    the previously kept point and the mean of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    kept = [0]
+    for i in range(threshold - 2):
+        first, stop = edges[i], edges[i + 1]
+        following = slice(stop, edges[i + 2]) if i + 2 < len(edges) else slice(n - 1, n)
+        mean_x, mean_y = x[following].mean(), y[following].mean()
+        previous = kept[-1]
+        areas = np.abs(
+            (x[previous] - mean_x) * (y[first:stop] - y[previous])
+            - (x[previous] - x[first:stop]) * (mean_y - y[previous])
+        )
+        kept.append(first + int(np.argmax(areas)))
+    kept.append(n - 1)
+    return np.asarray(kept)
+
+
+def downsample(days, sums, counts, start, end, max_points):
+    """Bucket a daily series to at most `max_points` points and return (stats, bucket)
+
+    The bucket size comes from the selected range (or the data's own span
+    when unbounded); if even monthly buckets exceed `max_points`, LTTB
+    picks the buckets that preserve the shape of the mean.
+    """
+    start = days[0] if start is None and len(days) else start
+    end = days[-1] if end is None and len(days) else end
+    bucket = choose_bucket(start, end, max_points) if start is not None else 'day'
+    stats = bucket_stats(days, sums, counts, bucket)
+    if len(stats) > max_points:
+        stats = stats.iloc[lttb(stats.index.asi8, stats['mean'].to_numpy(), max_points)]
+    return stats, bucket